@@ -1,17 +1,27 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import io
 import os
 import sys
 import json
 import shutil
+import hashlib
+import threading
 import subprocess
 import glob
 import argparse
+import functools
+import importlib.metadata
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor
-from read_config import Style, read_config, Symbol
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from read_config import Config, Style, read_config, Symbol
 from typing import Dict, List, Tuple, Optional, TypedDict
+from lxml import etree
+import fontTools
+from fontTools.ttLib import TTFont, woff2
+from fontTools.ttLib.tables._g_l_y_f import Glyph
+from fontTools.feaLib.builder import addOpenTypeFeaturesFromString
 
 # ANSI Color Code
 class Colors:
@@ -53,11 +63,15 @@ class Symbols:
     CHECK = "✓"
     CROSS = "✗"
 
-def print_colored(message, color=Colors.RESET, symbol="", bold=False):
-    """Print colored message with symbol"""
+def format_colored(message, color=Colors.RESET, symbol="", bold=False):
+    """Format colored message with symbol"""
     style = Colors.BOLD if bold else ""
     symbol_part = f"{symbol} " if symbol else ""
-    print(f"{color}{style}{symbol_part}{message}{Colors.RESET}")
+    return f"{color}{style}{symbol_part}{message}{Colors.RESET}"
+
+def print_colored(message, color=Colors.RESET, symbol="", bold=False):
+    """Print colored message with symbol"""
+    print(format_colored(message, color, symbol, bold))
 
 def print_success(message, symbol=Symbols.SUCCESS):
     """Print success message"""
@@ -90,31 +104,51 @@ DIST_DIR = PROJECT_ROOT / "dist"
 DEMO_DIR = PROJECT_ROOT / "demo"
 TEMP_DIR = PROJECT_ROOT / "temp"
 BUILD_DIR = PROJECT_ROOT / "build"
+SVG_CACHE_DIR = BUILD_DIR / "svg_cache"
+RESULT_CACHE_DIR = BUILD_DIR / "results"
+
+# WOFF2的brotli压缩等级，开发时可调低以加快构建（发布构建使用默认的11）
+BROTLI_QUALITY_SETTING = os.environ.get("CHROMANA_BROTLI_QUALITY", "11")
+try:
+    BROTLI_QUALITY = int(BROTLI_QUALITY_SETTING)
+except ValueError:
+    # 无效的设置由main()统一报告，工作进程导入时不报错
+    BROTLI_QUALITY = -1
+# save_woff2临时替换模块级的brotli.compress，替换期间持有此锁，
+# 避免并行的转换线程互相还原或读到被替换的函数
+BROTLI_LOCK = threading.Lock()
 
 # 确保输出目录存在
 DIST_DIR.mkdir(exist_ok=True)
 TEMP_DIR.mkdir(exist_ok=True)
 
+DEPS_MARKER = BUILD_DIR / ".deps_ok"
+
 # Check if nanoemoji is installed
 def check_dependencies():
-    print_info("Checking dependencies...", Symbols.INFO)
+    # 上次检查通过且环境未变化时跳过检查
+    deps_key = hashlib.sha1(
+        f"{sys.executable}:{nanoemoji_version()}:{fontTools.__version__}".encode()
+    ).hexdigest()
 
     try:
-        subprocess.run(["nanoemoji", "--help"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if DEPS_MARKER.read_text(encoding="utf-8") == deps_key:
+            return
+    except OSError:
+        pass
+
+    print_info("Checking dependencies...", Symbols.INFO)
+
+    if shutil.which("nanoemoji"):
         print_success("nanoemoji is installed", Symbols.CHECK)
-    except FileNotFoundError:
+    else:
         print_warning("nanoemoji not found, installing...", Symbols.WARNING)
         subprocess.run([sys.executable, "-m", "pip", "install", "nanoemoji"], check=True)
         print_success("nanoemoji installation complete", Symbols.SUCCESS)
+        nanoemoji_version.cache_clear()
 
-    # Check font conversion tools
-    try:
-        import fontTools
-        print_success(f"fontTools {fontTools.__version__} found", Symbols.CHECK)
-    except ImportError:
-        print_warning("fonttools not found, installing...", Symbols.WARNING)
-        subprocess.run([sys.executable, "-m", "pip", "install", "fonttools"], check=True)
-        print_success("fonttools installation complete", Symbols.SUCCESS)
+    # Check font conversion tools (imported at module load)
+    print_success(f"fontTools {fontTools.__version__} found", Symbols.CHECK)
 
     # Check WOFF2 support
     try:
@@ -123,6 +157,11 @@ def check_dependencies():
     except ImportError:
         print_warning("brotli not found, WOFF2 conversion may not be available", Symbols.WARNING)
         print_info("To enable WOFF2 support, install brotli: pip install brotli", Symbols.INFO)
+        # Keep warning about missing brotli on every build
+        return
+
+    BUILD_DIR.mkdir(exist_ok=True)
+    DEPS_MARKER.write_text(deps_key, encoding="utf-8")
 
 class SingleSymbol(TypedDict):
     name: str
@@ -136,19 +175,31 @@ class SingleSymbol(TypedDict):
 class NanoEmojiParams(TypedDict):
     font_name: str
     output_file: str
+    temp_dir: Path
+    build_dir: Path
     symbols: list[SingleSymbol]
 
 def prepare_nanoemoji_params(
     font_name: str,
     base_dir: Path,
     output_path: Path,
-    symbols: List[Symbol]
+    symbols: List[Symbol],
+    work_name: str
 ) -> NanoEmojiParams:
     # 基本信息
     output_file = str(output_path / f"{font_name}.ttf")
 
+    # 每个图标集使用独立的临时目录和构建目录，以便并行构建
+    temp_dir = TEMP_DIR / work_name
+    build_dir = BUILD_DIR / work_name
+
     valid_symbols: List[SingleSymbol] = []
 
+    # 预先计算目录前缀，路径只需一次字符串拼接
+    base_prefix = os.fspath(base_dir) + os.sep
+    default_prefix = base_prefix + "default" + os.sep
+    style_prefixes: Dict[str, str] = {}
+
     for sym in symbols:
         name = sym["name"]
         ligatures = sym["ligature"]
@@ -158,7 +209,7 @@ def prepare_nanoemoji_params(
             name=name,
             variant="default",
             style="default",
-            path=os.path.join(base_dir, "default", base_file),
+            path=default_prefix + base_file,
             ligatures=ligatures
         ))
 
@@ -167,16 +218,20 @@ def prepare_nanoemoji_params(
                 name=name,
                 variant=var,
                 style="default",
-                path=os.path.join(base_dir, "default", file),
+                path=default_prefix + file,
                 ligatures=ligatures
             ))
 
         for style, dir in sym["style"].items():
+            style_prefix = style_prefixes.get(dir)
+            if style_prefix is None:
+                style_prefix = style_prefixes[dir] = base_prefix + dir + os.sep
+
             valid_symbols.append(SingleSymbol(
                 name=name,
                 variant="default",
                 style=style,
-                path=os.path.join(base_dir, style, base_file),
+                path=style_prefix + base_file,
                 ligatures=ligatures
             ))
 
@@ -185,22 +240,33 @@ def prepare_nanoemoji_params(
                     name=name,
                     variant=var,
                     style=style,
-                    path=os.path.join(base_dir, dir, file),
+                    path=style_prefix + file,
                     ligatures=ligatures
                 ))
 
     return {
         "font_name": font_name,
         "output_file": output_file,
+        "temp_dir": temp_dir,
+        "build_dir": build_dir,
         "symbols": valid_symbols
     }
 
 GlyphMapping = Dict[str, SingleSymbol]
 
+@functools.lru_cache(maxsize=None)
+def nanoemoji_version() -> str:
+    try:
+        return importlib.metadata.version("nanoemoji")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
 # 使用nanoemoji生成基本字体
-def build_nanoemoji_font(params: NanoEmojiParams) -> tuple[Optional[Path], Optional[GlyphMapping]]:
+def build_nanoemoji_font(params: NanoEmojiParams, force=False) -> tuple[Optional[Path], Optional[GlyphMapping]]:
     font_name = params["font_name"]
     symbols = params["symbols"]
+    temp_dir = params["temp_dir"]
+    build_dir = params["build_dir"]
 
     if not symbols:
         print_error(f"No valid symbols found for {font_name}")
@@ -209,15 +275,15 @@ def build_nanoemoji_font(params: NanoEmojiParams) -> tuple[Optional[Path], Optio
     print_building(f"Building font {font_name} with {len(symbols)} icons")
 
     # Create temporary directory for renamed SVG files
-    temp_svg_dir = TEMP_DIR / "svgs"
-    temp_svg_dir.mkdir(exist_ok=True)
+    temp_svg_dir = temp_dir / "svgs"
+    temp_svg_dir.mkdir(parents=True, exist_ok=True)
 
-    # Store temporary SVG file paths
-    temp_svgs = []
+    # Store (source, temporary SVG path) pairs to preprocess
+    work_items: List[Tuple[str, Path]] = []
     # Store mapping between codepoints and glyph names
     glyph_mappings: GlyphMapping = {}
 
-    # Create a temporary copy for each SVG with filename format expected by nanoemoji
+    # Assign codepoints up front so the mapping stays deterministic
     for i, sym in enumerate(symbols):
         svg = sym["path"]
 
@@ -229,57 +295,110 @@ def build_nanoemoji_font(params: NanoEmojiParams) -> tuple[Optional[Path], Optio
         temp_filename = f"emoji_u{hex_codepoint}.svg"
         temp_svg_path = temp_svg_dir / temp_filename
 
-        # Preprocess SVG file and copy to temporary location
-        preprocess_svg(svg, temp_svg_path)
-        temp_svgs.append(str(temp_svg_path))
+        work_items.append((svg, temp_svg_path))
 
         # Store mapping between codepoint and glyph name
         glyph_mappings[hex_codepoint] = sym
 
-    print_success(f"Created {len(temp_svgs)} temporary SVG files using Unicode codepoints")
-
-    # Create a temporary configuration file
-    build_dir = BUILD_DIR
+    # Cache locations depend only on the source files, so the up-to-date check
+    # below can run before anything is preprocessed or staged
+    cache_paths = [svg_cache_path(svg) for svg, _ in work_items]
 
-    # nanoemoji outputs to build/Font.ttf by default, we'll record this path
+    # nanoemoji outputs to <build_dir>/Font.ttf, we'll record this path
     default_output = build_dir / "Font.ttf"
 
+    # Pass SVG paths through a flag file (one argument per line) to keep argv small
+    svg_list_file = temp_dir / "svglist.txt"
+
     # Build command line - Phase 1: Create basic font without ligature functionality
     cmd_basic = [
         "nanoemoji",
         "--family", font_name,
         "--color_format", "glyf_colr_0",
         "--output_file", str(default_output),
+        "--build_dir", str(build_dir),
         "--width", "0",
         "--ascender", "850",
         "--descender", "-150",
         "--noclip_to_viewbox",
-        *temp_svgs
+        f"--flagfile={svg_list_file}"
     ]
 
+    # 输入的SVG和参数与上次构建相同时，直接复用nanoemoji的输出，不必预处理和复制SVG
+    manifest_file = build_dir / "manifest.json"
+    manifest = {
+        "nanoemoji": nanoemoji_version(),
+        "command": cmd_basic,
+        "svgs": {path.name: cache_path.name for (_, path), cache_path in zip(work_items, cache_paths)}
+    }
+
+    # --force时总是重新运行nanoemoji，以便替换损坏的输出
+    try:
+        with open(manifest_file, "r", encoding="utf-8") as f:
+            up_to_date = not force and json.load(f) == manifest and default_output.exists()
+    except (OSError, ValueError):
+        up_to_date = False
+
+    if up_to_date:
+        print_success(f"SVG inputs unchanged, reusing basic font: {default_output}")
+        return default_output, glyph_mappings
+
+    # Preprocess SVG files missing from the cache in parallel worker processes
+    SVG_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # Variants and styles may share a source file, preprocess each file only once
+    missing = {
+        cache_path: svg for (svg, _), cache_path in zip(work_items, cache_paths) if not cache_path.exists()
+    }
+
+    if missing:
+        max_workers = min(len(missing), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(cache_svg, missing.values(), missing.keys(), chunksize=16))
+
+    # Copy the preprocessed SVGs into the temporary location concurrently
+    max_workers = min(16, (os.cpu_count() or 1) * 2)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(stage_svg, [svg for svg, _ in work_items], cache_paths, [path for _, path in work_items]))
+
+    print_success(f"Created {len(work_items)} temporary SVG files using Unicode codepoints")
+
+    svg_list_file.write_text(
+        "\n".join([str(temp_svg_path) for _, temp_svg_path in work_items]), encoding="utf-8"
+    )
+
+    manifest_file.unlink(missing_ok=True)
+
     # Execute command to create basic font
     print_step("Executing nanoemoji to create basic font")
-    print_info(f"{' '.join(cmd_basic[:6])}... (plus {len(temp_svgs)} SVG files)")
+    print_info(f"{' '.join(cmd_basic[:6])}... (plus {len(work_items)} SVG files)")
+
+    # nanoemoji的输出直接写入日志文件，不在内存中缓存；构建目录保留日志以便排查
+    build_dir.mkdir(parents=True, exist_ok=True)
+    log_file = build_dir / "nanoemoji.log"
+
+    with open(log_file, "wb") as log:
+        returncode = subprocess.run(cmd_basic, stdout=log, stderr=subprocess.STDOUT).returncode
+
+    if returncode != 0:
+        print_error(f"Error running nanoemoji to create basic font (exit code {returncode}), full log: {log_file}")
+
+        # 错误信息通常在末尾，只输出日志的最后部分
+        with open(log_file, "rb") as log:
+            log.seek(max(0, log_file.stat().st_size - 2000))
+            print_error(f"Output: ...{log.read().decode(errors='replace')}")
 
-    try:
-        subprocess.run(cmd_basic, check=True)
-    except subprocess.CalledProcessError as e:
-        print_error(f"Error running nanoemoji to create basic font: {e}")
-        try:
-            result = subprocess.run(cmd_basic, capture_output=True, text=True)
-            print_error(f"Stdout: {result.stdout[:500]}..." if len(result.stdout) > 500 else result.stdout)
-            print_error(f"Stderr: {result.stderr[:500]}..." if len(result.stderr) > 500 else result.stderr)
-        except Exception as e2:
-            print_error(f"Error capturing output: {e2}")
         return None, None
 
     # Check if basic font was created successfully
-    if not os.path.exists(default_output):
+    if not default_output.exists():
         print_error(f"Basic font file not created at expected location: {default_output}")
         return None, None
 
     print_success(f"Successfully created basic font: {default_output}")
 
+    with open(manifest_file, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
     return default_output, glyph_mappings
 
 # 创建字符到标准名称的映射字典
@@ -350,45 +469,48 @@ for c in range(ord('a'), ord('z') + 1):
 for c in range(ord('A'), ord('Z') + 1):
     char_name_map[chr(c)] = chr(c)
 
+class LigatureTranslateTable(dict):
+    """str.translate table mapping code points to space-prefixed glyph names"""
+
+    def __missing__(self, char_code: int) -> str:
+        # 其他字符使用Unicode命名
+        if char_code <= 0xFFFF:
+            # BMP字符用4位十六进制表示
+            name = f" uni{char_code:04X}"
+        else:
+            # 非BMP字符用5-6位十六进制表示
+            name = f" u{char_code:06X}"
+
+        self[char_code] = name
+        return name
+
+# 预先计算的转换表，使每个连字只需一次str.translate调用
+LIGA_TRANSLATE_TABLE = LigatureTranslateTable(
+    (ord(c), f" {name}") for c, name in char_name_map.items()
+)
+
 def liga_to_string(ligature: str, glyph_name: str) -> Optional[str]:
     if not ligature or len(ligature) < 1:
         return None
 
-    # 将每个字符转换为FEA中的正确表示
-    processed_chars = []
-
-    # 处理每个字符
-    for c in ligature:
-        # 检查字符是否在映射字典中
-        if c in char_name_map:
-            processed_chars.append(char_name_map[c])
-        # 其他字符使用Unicode命名
-        else:
-            char_code = ord(c)
-            if char_code <= 0xFFFF:
-                # BMP字符用4位十六进制表示
-                processed_chars.append(f"uni{char_code:04X}")
-            else:
-                # 非BMP字符用5-6位十六进制表示
-                processed_chars.append(f"u{char_code:06X}")
+    # 将每个字符转换为FEA中的正确表示，字符之间用空格分隔
+    liga_string = ligature.translate(LIGA_TRANSLATE_TABLE)[1:]
 
     # 检查是否有成功处理的字符
-    if not processed_chars:
+    if not liga_string:
         print_warning(f"No valid characters in ligature for {glyph_name}", Symbols.WARNING)
         return None
 
-    # 创建FEA规则字符串，字符之间用空格分隔
-    liga_string = " ".join(processed_chars)
-
     return liga_string
 
 # Add ligature functionality to font
-def add_ligatures_to_font(font_file: Path, output_file: str, glyph_mappings: GlyphMapping):
+def add_ligatures_to_font(font_file: Path, output_file: str, glyph_mappings: GlyphMapping, temp_dir: Path):
     print_step(f"Adding ligature functionality to font: {font_file}")
 
     # Step 1: Create ligature rules list
     variants: list[str] = []
     styles: list[str] = []
+    style_indices: dict[str, int] = {}
 
     liga_list: list[tuple[str, str]] = []
     salt_list: list[tuple[str, list[str]]] = []
@@ -405,7 +527,8 @@ def add_ligatures_to_font(font_file: Path, output_file: str, glyph_mappings: Gly
         if variant != 'default':
             variants.append(variant)
 
-        if style != 'default' and style not in styles:
+        if style != 'default' and style not in style_indices:
+            style_indices[style] = len(styles)
             styles.append(style)
             ss0x_lists.append([])
 
@@ -417,13 +540,11 @@ def add_ligatures_to_font(font_file: Path, output_file: str, glyph_mappings: Gly
         variant = sym["variant"]
         style = sym["style"]
 
-        if glyph_name not in groups:
-            groups[glyph_name] = (ligatures, {})
+        var_group = groups.setdefault(glyph_name, (ligatures, {}))[1]
+        var_group.setdefault(style, {})[variant] = hex_codepoint
 
-        if style not in groups[glyph_name][1]:
-            groups[glyph_name][1][style] = { variant : hex_codepoint }
-        else:
-            groups[glyph_name][1][style][variant] = hex_codepoint
+    # Precompute glyph names for every codepoint once
+    hex_to_uniname = {h: f"uni{int(h, 16):04X}" for h in glyph_mappings}
 
     for glyph_name, (ligatures, var_group) in groups.items():
         # default style
@@ -439,8 +560,7 @@ def add_ligatures_to_font(font_file: Path, output_file: str, glyph_mappings: Gly
                 if not liga_string:
                     continue
 
-                unicode_name = f"uni{int(default_hex, 16):04X}"
-                liga_list.append((liga_string, unicode_name))
+                liga_list.append((liga_string, hex_to_uniname[default_hex]))
                 added_rules += 1
 
             except Exception as e:
@@ -458,90 +578,73 @@ def add_ligatures_to_font(font_file: Path, output_file: str, glyph_mappings: Gly
             if style == "default":
                 continue
 
-            style_index = styles.index(style)
-            ss0x_list = ss0x_lists[style_index]
+            ss0x_list = ss0x_lists[style_indices[style]]
 
             for variant, hex_codepoint in style_variant_dict.items():
                 original_hex = default_variant_dict[variant]
 
-                ss0x_list.append((original_hex, f"uni{int(hex_codepoint, 16):04X}"))
+                ss0x_list.append((original_hex, hex_to_uniname[hex_codepoint]))
 
-    # Step 2: Create FEA file to support ligature functionality
-    fea_file = TEMP_DIR / f"{os.path.basename(output_file)}.fea"
+    # Step 2: Create FEA content to support ligature functionality
+    fea_file = temp_dir / f"{Path(output_file).name}.fea"
 
-    fea_content = [
-        "languagesystem DFLT dflt;",
-        "",
-    ]
+    # 在内存中生成FEA内容，直接交给feaLib编译，无需写入再读回磁盘
+    fea = io.StringIO()
+    fea.write("languagesystem DFLT dflt;\n\n")
 
     if len(liga_list) > 0:
-        fea_content.extend(["feature liga {"])
+        fea.write("feature liga {\n")
 
         for (liga_string, unicode_name) in liga_list:
-            fea_content.append(f"  sub {liga_string} by {unicode_name};")
+            fea.write(f"  sub {liga_string} by {unicode_name};\n")
 
-    fea_content.extend(["} liga;", ""])
+        fea.write("} liga;\n\n")
 
     if len(salt_list) > 0:
-        fea_content.append("feature salt {  # Stylistic Alternates")
+        fea.write("feature salt {  # Stylistic Alternates\n")
 
         for (base_hex, alt_hexes) in salt_list:
-            base_name = f"uni{int(base_hex, 16):04X}"
-            alt_names = [f"uni{int(h, 16):04X}" for h in alt_hexes]
-            alt_list = ", ".join(alt_names)
-            fea_content.append(f"  sub {base_name} from [{alt_list}];")
+            base_name = hex_to_uniname[base_hex]
+            alt_list = ", ".join([hex_to_uniname[h] for h in alt_hexes])
+            fea.write(f"  sub {base_name} from [{alt_list}];\n")
 
-        fea_content.append("} salt;")
-        fea_content.append("")
+        fea.write("} salt;\n\n")
 
     for i, ss0x_list in enumerate(ss0x_lists):
         if len(ss0x_list) < 1:
             continue
 
-        fea_content.append(f"feature ss0{i+1} {{  # Stylistic Set {i+1} ({styles[i]})")
+        fea.write(f"feature ss0{i+1} {{  # Stylistic Set {i+1} ({styles[i]})\n")
 
         for (original_hex, alt_name) in ss0x_list:
-            original_name = f"uni{int(original_hex, 16):04X}"
-            fea_content.append(f"  sub {original_name} by {alt_name};")
+            original_name = hex_to_uniname[original_hex]
+            fea.write(f"  sub {original_name} by {alt_name};\n")
 
-        fea_content.append(f"}} ss0{i+1};")
-        fea_content.append("")
+        fea.write(f"}} ss0{i+1};\n\n")
 
-    # Write FEA file
-    with open(fea_file, "w") as f:
-        f.write("\n".join(fea_content))
+    total_rules = added_rules + len(salt_list) + sum(len(ss0x_list) for ss0x_list in ss0x_lists)
+    fea_text = fea.getvalue()
 
-    print_success(f"Created feature file: {fea_file}")
+    # 仅在调试时保留FEA文件
+    if os.environ.get("CHROMANA_DUMP_FEA"):
+        fea_file.write_text(fea_text, encoding="utf-8")
+        print_success(f"Created feature file: {fea_file}")
 
     # Step 3: Use FontTools to add ligature functionality
     try:
-        from fontTools.ttLib import TTFont
-        from fontTools.feaLib.builder import addOpenTypeFeatures
-        import re
-
         # Read basic font
         print_info("Adding ligature features to font...")
-        font = TTFont(font_file)
+        font = TTFont(font_file, lazy=True)
 
         # Get all available glyph names in font
         available_glyphs = set(font.getGlyphOrder())
         print_info(f"Font contains {len(available_glyphs)} glyphs")
 
-        # Use TTX to temporarily export font for adding missing glyphs later
-        ttx_temp_file = str(TEMP_DIR / "temp_font.ttx")
-        print_info(f"Exporting font to TTX format: {ttx_temp_file}")
-        font.saveXML(ttx_temp_file)
-
-        # Check and fix FEA file, find all missing glyphs that need to be added
-        with open(fea_file, "r") as f:
-            fea_content = f.read()
-
-        # Use regex to find all referenced glyph names
-        pattern = r'sub (.*?) by ([^;]+);'
-        matches = re.findall(pattern, fea_content)
-
-        # Collect all glyphs that need to be added
-        missing_glyphs = set()
+        # Optionally export font to TTX format for debugging
+        if os.environ.get("CHROMANA_DUMP_TTX"):
+            ttx_temp_file = str(temp_dir / "temp_font.ttx")
+            print_info(f"Exporting font to TTX format: {ttx_temp_file}")
+            font.saveXML(ttx_temp_file)
 
         INPUT_GLYPHS = {
             "braceleft": 0x007B, "braceright": 0x007D, "slash": 0x002F,
@@ -554,57 +657,68 @@ def add_ligatures_to_font(font_file: Path, output_file: str, glyph_mappings: Gly
             **{ chr(cp): cp for cp in range(0x41, 0x5B) }
         }
 
-        # Prepare input glyphs
-        for gname, cp in INPUT_GLYPHS.items():
-            def add_empty_input_glyph(font: TTFont, name: str, advance=0):
-                if name in font["glyf"].glyphs: return
-                from fontTools.ttLib.tables._g_l_y_f import Glyph
-                g = Glyph(); g.numberOfContours = 0
-                g.xMin = g.yMin = g.xMax = g.yMax = 0
-                font["glyf"].glyphs[name] = g
-                font["hmtx"].metrics[name] = (advance, 0)
-                order = font.getGlyphOrder(); order.append(name); font.setGlyphOrder(order)
+        # Prepare input glyphs, updating the glyph order once at the end
+        glyphs = font["glyf"].glyphs
+        metrics = font["hmtx"].metrics
+        order = font.getGlyphOrder()
+
+        def add_empty_input_glyph(name: str, advance=0):
+            if name in glyphs: return
+            g = Glyph(); g.numberOfContours = 0
+            g.xMin = g.yMin = g.xMax = g.yMax = 0
+            glyphs[name] = g
+            metrics[name] = (advance, 0)
+            order.append(name)
+
+        for gname in INPUT_GLYPHS:
+            add_empty_input_glyph(gname, advance=0)
 
-            add_empty_input_glyph(font, gname, advance=0)
+        font.setGlyphOrder(order)
 
         def add_mapping_to_unicode_cmaps(font: TTFont, mapping: dict[int,str]):
             cmap = font["cmap"]
             for st in cmap.tables:
                 if st.platformID == 0 or (st.platformID == 3 and st.platEncID in (1,10)):
-                    for cp, g in mapping.items():
-                        if cp not in st.cmap:
-                            st.cmap[cp] = g
+                    # 已有的映射优先，只批量补充缺失的码位
+                    st.cmap.update({cp: g for cp, g in mapping.items() if cp not in st.cmap})
 
         add_mapping_to_unicode_cmaps(font, {cp: name for name, cp in INPUT_GLYPHS.items()})
 
         # All glyphs should already exist, directly use original FEA file
-        print_info(f"Found {len(matches)} rules in original FEA file")
+        print_info(f"Found {total_rules} rules in FEA file")
 
         # Add OpenType features using original FEA file
-        print_info(f"Adding OpenType features from {fea_file}")
-        addOpenTypeFeatures(font, str(fea_file), tables=["GSUB"])
-
-        # Save font with ligature functionality
-        font_path = Path(font_file)
-        enhanced_output = font_path.with_name(f"{os.path.basename(output_file)}")
-        font.save(enhanced_output)
-        print_success(f"Saved enhanced font (with ligatures) to: {enhanced_output}")
+        print_info("Adding OpenType features...")
+        addOpenTypeFeaturesFromString(font, fea_text, filename=str(fea_file), tables=["GSUB"])
 
         # Ensure output directory exists
-        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        Path(output_file).parent.mkdir(parents=True, exist_ok=True)
 
-        # Copy to specified output location
-        shutil.copy2(enhanced_output, output_file)
-        print_success(f"Copied font to final location: {output_file}")
+        # Save font with ligature functionality directly to the output location
+        font.save(output_file)
+        print_success(f"Saved enhanced font (with ligatures) to: {output_file}")
 
         return True
     except Exception as e:
         print_error(f"Error adding ligature features: {e}")
         return False
 
-def convert_fonts(ttf_path):
-    from fontTools.ttLib import TTFont
+def save_woff2(font, woff2_path):
+    """Save font as WOFF2 using the configured brotli quality"""
+    if BROTLI_QUALITY == 11 or not woff2.haveBrotli:
+        font.save(woff2_path)
+        return
+
+    # 进程内只有这里使用brotli，锁内的替换对其他线程不可见
+    with BROTLI_LOCK:
+        compress = woff2.brotli.compress
+        woff2.brotli.compress = functools.partial(compress, quality=BROTLI_QUALITY)
+        try:
+            font.save(woff2_path)
+        finally:
+            woff2.brotli.compress = compress
 
+def convert_fonts(ttf_path):
     base_path = Path(ttf_path).with_suffix("")
     woff_path = f"{base_path}.woff"
     woff2_path = f"{base_path}.woff2"
@@ -613,45 +727,70 @@ def convert_fonts(ttf_path):
 
     # Load TTF font
     try:
-        font = TTFont(ttf_path)
+        # Read the TTF once and load each flavor from the shared bytes,
+        # so each pass starts from the raw tables
+        ttf_data = Path(ttf_path).read_bytes()
+    except Exception as e:
+        print_error(f"Font conversion error: {e}")
+        return {"ttf": ttf_path, "woff": None, "woff2": None}
 
-        # Save as WOFF
-        print_info(f"Saving WOFF format to {woff_path}")
+    # 边界框和时间戳在保存TTF时已经计算过，转换时原样保留，不必重新计算
+    # 不能使用lazy=True：从BytesIO延迟加载的字体在save时会访问reader.file.name而出错
+    def load_flavor_font():
+        return TTFont(io.BytesIO(ttf_data), recalcBBoxes=False, recalcTimestamp=False)
+
+    # 工作线程中不输出日志，两个线程同时打印时行会交错在一起；
+    # 结果和错误都在调用线程中按顺序输出
+    def save_woff_flavor():
+        font = load_flavor_font()
         font.flavor = "woff"
         font.save(woff_path)
-        print_success("WOFF format saved successfully", Symbols.CHECK)
 
-        # Try to save as WOFF2
-        try:
-            print_info(f"Saving WOFF2 format to {woff2_path}")
-            font.flavor = "woff2"
-            font.save(woff2_path)
-            print_success("WOFF2 format saved successfully", Symbols.CHECK)
-            has_woff2 = True
-        except Exception as e:
-            print_warning(f"Error saving WOFF2 format: {e}")
-            print_info("This may be because the woff2 Python module is not installed")
-            print_info("You can install it with: pip install brotli")
-            has_woff2 = False
+    def save_woff2_flavor():
+        font = load_flavor_font()
+        font.flavor = "woff2"
+        save_woff2(font, woff2_path)
+
+    print_info(f"Saving WOFF format to {woff_path}")
+    print_info(f"Saving WOFF2 format to {woff2_path}")
 
+    # zlib和brotli压缩时释放GIL，两种格式可以并行生成
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        woff_future = executor.submit(save_woff_flavor)
+        woff2_future = executor.submit(save_woff2_flavor)
+
+    try:
+        woff_future.result()
     except Exception as e:
         print_error(f"Font conversion error: {e}")
         return {"ttf": ttf_path, "woff": None, "woff2": None}
 
+    print_success("WOFF format saved successfully", Symbols.CHECK)
+
+    # Try to save as WOFF2
+    try:
+        woff2_future.result()
+        print_success("WOFF2 format saved successfully", Symbols.CHECK)
+        has_woff2 = True
+    except Exception as e:
+        print_warning(f"Error saving WOFF2 format: {e}")
+        print_info("This may be because the woff2 Python module is not installed")
+        print_info("You can install it with: pip install brotli")
+        has_woff2 = False
+
     return {
         "ttf": ttf_path,
         "woff": woff_path,
         "woff2": woff2_path if has_woff2 else None
     }
 
-# Generate CSS
-def generate_css(font_name, font_files, font_code, version):
-    css = f"""/* {font_name} Icon Font */
+# CSS模板只解析一次，生成时用format_map填充
+CSS_TEMPLATE = """/* {font_name} Icon Font */
 @font-face {{
   font-family: '{font_name}';
-  src: url('../dist/{font_code}/{os.path.basename(font_files["woff2"])}') format('woff2'),
-       url('../dist/{font_code}/{os.path.basename(font_files["woff"])}') format('woff'),
-       url('../dist/{font_code}/{os.path.basename(font_files["ttf"])}') format('truetype');
+  src: url('../dist/{font_code}/{woff2_file}') format('woff2'),
+       url('../dist/{font_code}/{woff_file}') format('woff'),
+       url('../dist/{font_code}/{ttf_file}') format('truetype');
   font-weight: normal;
   font-style: normal;
 }}
@@ -699,9 +838,18 @@ def generate_css(font_name, font_files, font_code, version):
   font-feature-settings: 'liga', 'ss02';
 }}
 """
+
+# Generate CSS
+def generate_css(font_name, font_files, font_code, version):
+    css = CSS_TEMPLATE.format_map({
+        "font_name": font_name,
+        "font_code": font_code,
+        "woff2_file": os.path.basename(font_files["woff2"]),
+        "woff_file": os.path.basename(font_files["woff"]),
+        "ttf_file": os.path.basename(font_files["ttf"]),
+    })
     css_path = DEMO_DIR / f"{font_code}-{version}.css"
-    with open(css_path, "w") as f:
-        f.write(css)
+    css_path.write_text(css, encoding="utf-8")
 
     return css_path
 
@@ -722,24 +870,16 @@ def generate_html(
                 category_order.append(category_name)
 
     # Categorize symbols for display by category
+    # 每个符号只取一次显示所需字段，存为 (name, ligature, overflow) 元组
     categorized_symbols = {}
     for symbol in symbols:
-        name = symbol["name"]
-        ligature = symbol["ligature"]
         category = symbol.get("category", "default")
-        overflow = symbol.get("overflow", False)
-
-        if category not in categorized_symbols:
-            categorized_symbols[category] = []
-
-        categorized_symbols[category].append({
-            "name": name,
-            "ligature": ligature,
-            "overflow": overflow
-        })
+        categorized_symbols.setdefault(category, []).append(
+            (symbol["name"], symbol["ligature"], symbol.get("overflow", False))
+        )
 
     # Generate HTML for various categories
-    category_sections = ""
+    category_parts = []
 
     # Process all categories
     all_categories = []
@@ -757,32 +897,24 @@ def generate_html(
     # Generate HTML based on category order
     for category in all_categories:
         category_symbols = categorized_symbols[category]
-        symbols_html = ""
+        symbol_parts = []
 
-        for symbol in category_symbols:
-            name = symbol["name"]
-            ligature = symbol["ligature"]
-
-            # Handle multiple ligatures
-            if isinstance(ligature, list):
-                primary_ligature = ligature[0]  # Use first ligature as primary display
-                all_ligatures = ", ".join(ligature)  # Show all ligatures separated by commas
-            else:
-                primary_ligature = ligature
-                all_ligatures = ligature
+        for name, ligature, overflow in category_symbols:
+            # Handle multiple ligatures (read_config always yields a list)
+            primary_ligature = ligature[0]  # Use first ligature as primary display
+            all_ligatures = ", ".join(ligature)  # Show all ligatures separated by commas
 
             # Check for wide characters (like 1000000, etc.)
-            wide_char_class = ""
-
-            if symbol["overflow"]:  # Judge by name or character length
-                wide_char_class = " wide-icon"
+            wide_char_class = " wide-icon" if overflow else ""
 
-            symbols_html += f"""
+            symbol_parts.append(f"""
         <div class="icon-item{wide_char_class}">
           <i class="{font_code}-icon icon-display">{primary_ligature}</i>
           <div class="icon-name">{name}</div>
           <div class="icon-code">{all_ligatures}</div>
-        </div>"""
+        </div>""")
+
+        symbols_html = "".join(symbol_parts)
 
         # Use display name from configuration, or format as title
         category_title = category_display_names.get(
@@ -790,35 +922,35 @@ def generate_html(
             category.replace('_', ' ').replace('-', ' ').title()
         )
 
-        category_sections += f"""
+        category_parts.append(f"""
       <div class="symbol-category">
         <h3 class="category-title">{category_title}</h3>
         <div class="icons-grid">
           {symbols_html}
         </div>
-      </div>"""
+      </div>""")
+
+    category_sections = "".join(category_parts)
 
     # If no categories, display all symbols directly
     if not categorized_symbols:
-        symbols_html = ""
+        symbol_parts = []
         for symbol in symbols:
             name = symbol["name"]
             ligature = symbol["ligature"]
 
-            # Handle multiple ligatures
-            if isinstance(ligature, list):
-                primary_ligature = ligature[0]  # Use first ligature as primary display
-                all_ligatures = ", ".join(ligature)  # Show all ligatures separated by commas
-            else:
-                primary_ligature = ligature
-                all_ligatures = ligature
+            # Handle multiple ligatures (read_config always yields a list)
+            primary_ligature = ligature[0]  # Use first ligature as primary display
+            all_ligatures = ", ".join(ligature)  # Show all ligatures separated by commas
 
-            symbols_html += f"""
+            symbol_parts.append(f"""
         <div class="icon-item">
           <i class="{font_code}-icon icon-display">{primary_ligature}</i>
           <div class="icon-name">{name}</div>
           <div class="icon-code">{all_ligatures}</div>
-        </div>"""
+        </div>""")
+
+        symbols_html = "".join(symbol_parts)
 
         category_sections = f"""
       <div class="symbol-category">
@@ -831,8 +963,10 @@ def generate_html(
     styles_html = ""
 
     if styles and len(styles) > 0:
-        for style in styles:
-            styles_html += f"<button class='mode-button' data-mode='{style.get('name')}'>{style.get('display_name', style.get('name'))}</button>\n"
+        styles_html = "".join([
+            f"<button class='mode-button' data-mode='{style.get('name')}'>{style.get('display_name', style.get('name'))}</button>\n"
+            for style in styles
+        ])
 
     examples_html = generate_examples_html(font_code, examples)
 
@@ -852,7 +986,7 @@ def generate_html(
   <meta name="viewport" content="width=device-width, initial-scale=1.0">
   <title>{font_name}</title>
   <link rel="stylesheet" href="./style.css">
-  <link rel="stylesheet" href="./{os.path.basename(css_path)}">
+  <link rel="stylesheet" href="./{css_path.name}">
   <script src="./{font_code}-action.js"></script>
 </head>
 <body>
@@ -927,8 +1061,7 @@ def generate_html(
 </html>
 """
     html_path = DEMO_DIR / f"{font_code}.html"
-    with open(html_path, "w") as f:
-        f.write(html)
+    html_path.write_text(html, encoding="utf-8")
 
     return html_path
 
@@ -941,7 +1074,7 @@ def generate_examples_html(font_code, examples=None):
         return None
 
     # Use examples from configuration
-    examples_html = ""
+    examples_html = io.StringIO()
     for i, example in enumerate(examples):
         text = example.get("text", "这是一个示例文本")
         desc = example.get("desc", f"示例 {i+1}")
@@ -961,7 +1094,7 @@ def generate_examples_html(font_code, examples=None):
         # Handle shadow mode
         shadow_class = " shadow" if is_shadow else ""
 
-        examples_html += f"""
+        examples_html.write(f"""
           <div class="example-text-container" style="width: {width};">
             <div class="example-text-content">
               <div style="{style}">
@@ -970,9 +1103,11 @@ def generate_examples_html(font_code, examples=None):
             </div>
             <div class="example-desc">{desc}</div>
           </div>
-        """
+        """)
 
-    return examples_html
+    return examples_html.getvalue()
+
+SVG_DOCTYPE = '<!DOCTYPE svg PUBLIC "-//W3C//DTD SVG 1.1//EN" "http://www.w3.org/Graphics/SVG/1.1/DTD/svg11.dtd">'
 
 # Preprocess SVG files, fix duplicate IDs and other issues
 def preprocess_svg(svg_path, temp_svg_path):
@@ -981,39 +1116,28 @@ def preprocess_svg(svg_path, temp_svg_path):
     1. Duplicate element IDs
     2. Incompatible elements
     """
-    import re
-    from xml.dom import minidom
-
     try:
-        # Parse SVG file using minidom
-        dom = minidom.parse(svg_path)
-
-        # Get all elements with id attributes
-        elements_with_ids = {}
-        # Traverse all possible element types that might have id attributes
-        for elem_type in ['path', 'g', 'rect', 'circle', 'ellipse', 'line', 'polyline', 'polygon']:
-            for elem in dom.getElementsByTagName(elem_type):
-                if elem.hasAttribute('id'):
-                    elem_id = elem.getAttribute('id')
-                    if elem_id not in elements_with_ids:
-                        elements_with_ids[elem_id] = []
-                    elements_with_ids[elem_id].append(elem)
-
-        # Fix duplicate ID issues
-        for elem_id, elems in elements_with_ids.items():
-            if len(elems) > 1:
-                for i, elem in enumerate(elems[1:], 1):
-                    new_id = f"{elem_id}_{i}"
-                    elem.setAttribute('id', new_id)
-
-        # Write modified SVG
-        with open(temp_svg_path, 'w', encoding='utf-8') as f:
-            # String generated by xml.dom.minidom includes XML declaration, we need to manually add SVG DOCTYPE
-            svg_content = dom.toxml()
-            # Add DOCTYPE if needed (optional)
-            svg_content = svg_content.replace('<?xml version="1.0" ?>',
-                                             '<?xml version="1.0" encoding="UTF-8" standalone="no"?>\n<!DOCTYPE svg PUBLIC "-//W3C//DTD SVG 1.1//EN" "http://www.w3.org/Graphics/SVG/1.1/DTD/svg11.dtd">')
-            f.write(svg_content)
+        # Parse SVG file using lxml
+        tree = etree.parse(svg_path, parser=etree.XMLParser(huge_tree=False, remove_blank_text=False))
+        root = tree.getroot()
+
+        # Fix duplicate ID issues, keeping the first occurrence unchanged
+        seen_ids: Dict[str, int] = {}
+        for elem in root.xpath('.//*[@id]'):
+            elem_id = elem.get('id')
+            count = seen_ids.get(elem_id, 0)
+            if count > 0:
+                elem.set('id', f"{elem_id}_{count}")
+            seen_ids[elem_id] = count + 1
+
+        # Write modified SVG with XML declaration and SVG DOCTYPE
+        tree.write(
+            str(temp_svg_path),
+            xml_declaration=True,
+            encoding='UTF-8',
+            standalone=False,
+            doctype=SVG_DOCTYPE
+        )
 
         return True
     except Exception as e:
@@ -1022,8 +1146,104 @@ def preprocess_svg(svg_path, temp_svg_path):
         shutil.copy2(svg_path, temp_svg_path)
         return False
 
+# Bump when preprocess_svg output changes to invalidate cached SVGs
+SVG_CACHE_VERSION = 1
+
+def svg_cache_path(svg_path) -> Path:
+    """Cache location of the preprocessed svg_path, keyed by source path, mtime and size"""
+    st = os.stat(svg_path)
+    key = f"{SVG_CACHE_VERSION}:{os.path.abspath(svg_path)}:{st.st_mtime_ns}:{st.st_size}"
+    return SVG_CACHE_DIR / f"{hashlib.sha1(key.encode()).hexdigest()}.svg"
+
+def cache_svg(svg_path, cache_path: Path):
+    """Preprocess svg_path into cache_path; runs in a worker process"""
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    if preprocess_svg(svg_path, tmp_path):
+        os.replace(tmp_path, cache_path)
+    else:
+        # Don't cache fallback copies, so the error is reported on every build
+        os.unlink(tmp_path)
+
+def stage_svg(svg_path, cache_path: Path, temp_svg_path: Path):
+    """Place the cached preprocessed copy of svg_path at temp_svg_path"""
+    if not cache_path.exists():
+        # Preprocessing failed, use the original file
+        shutil.copy2(svg_path, temp_svg_path)
+        return
+
+    # Copy without preserving mtime: nanoemoji's ninja build compares timestamps,
+    # and a cached file's old mtime could hide a change of codepoint assignment
+    shutil.copyfile(cache_path, temp_svg_path)
+
+def compute_icon_set_digest(icon_dir_path: Path) -> str:
+    """
+    Fingerprint everything that affects an icon set's output:
+    all files in its directory, the build scripts, the WOFF2 compression level
+    and the installed nanoemoji and fontTools versions
+    """
+    # 工具链升级后旧的字体不再可信，版本号计入摘要
+    digest = hashlib.blake2b(
+        f"{BROTLI_QUALITY}\0{nanoemoji_version()}\0{fontTools.__version__}".encode()
+    )
+
+    script_dir = Path(__file__).resolve().parent
+    inputs = [script_dir / "build.py", script_dir / "read_config.py"]
+    inputs.extend(sorted(p for p in icon_dir_path.rglob("*") if p.is_file()))
+
+    for path in inputs:
+        digest.update(str(path.relative_to(PROJECT_ROOT)).encode())
+        digest.update(path.read_bytes())
+
+    return digest.hexdigest()
+
+def load_cached_result(icon_dir_path: Path, digest: str):
+    """Return the cached result of an unchanged icon set, or None if it has to be rebuilt"""
+    cache_file = RESULT_CACHE_DIR / f"{icon_dir_path.name}.json"
+
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if cached.get("digest") != digest:
+        return None
+
+    result = cached["result"]
+    outputs = [path for path in result["files"].values() if path]
+    outputs.extend([result["css"], result["html"]])
+
+    # 输出文件被删除时需要重新构建
+    if not all(os.path.exists(path) for path in outputs):
+        return None
+
+    result["css"] = Path(result["css"])
+    result["html"] = Path(result["html"])
+    return result
+
+def save_cached_result(icon_dir_path: Path, digest: str, result):
+    RESULT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+
+    cached = {
+        "digest": digest,
+        "result": {
+            "name": result["name"],
+            "code": result["code"],
+            "version": result["version"],
+            "files": result["files"],
+            "css": str(result["css"]),
+            "html": str(result["html"])
+        }
+    }
+
+    with open(RESULT_CACHE_DIR / f"{icon_dir_path.name}.json", "w", encoding="utf-8") as f:
+        json.dump(cached, f, indent=2)
+
+# Extensions of previous build outputs in an icon set's dist directory
+OLD_OUTPUT_KINDS = {".ttf": "font", ".woff": "font", ".woff2": "font", ".css": "CSS"}
+
 # Process individual icon set
-def process_icon_set(icon_dir):
+def process_icon_set(icon_dir, force=False, config: Optional[Config]=None):
     icon_dir_path = Path(icon_dir)
     config_path = icon_dir_path / "config.toml"
 
@@ -1031,10 +1251,9 @@ def process_icon_set(icon_dir):
         print_warning(f"config.toml not found in {icon_dir_path}, skipping...")
         return None
 
-    print_building(f"Processing icon set: {icon_dir_path.name}", Symbols.BUILDING)
-
-    # Read configuration
-    config = read_config(config_path)
+    # Read configuration, unless main() already parsed it
+    if config is None:
+        config = read_config(config_path)
     font_name = f'Chromana-{config["code"]}'
     font_code = config["code"]
     version = config["version"]
@@ -1042,50 +1261,66 @@ def process_icon_set(icon_dir):
     categories = config.get("categories")
     styles = config.get("styles")
 
+    # 输入未变化时直接复用上次的构建结果
+    digest = compute_icon_set_digest(icon_dir_path)
+
+    if not force:
+        cached_result = load_cached_result(icon_dir_path, digest)
+
+        if cached_result is not None:
+            print_success(f"{font_name} is up to date, skipping build", Symbols.CHECK)
+            cached_result["symbols"] = symbols
+            cached_result["categories"] = categories
+            return cached_result
+
+    print_building(f"Processing icon set: {icon_dir_path.name}", Symbols.BUILDING)
+
     print_info(f"Found {len(symbols)} symbols in {font_name}")
 
     # Create output directory
     font_dist_dir = DIST_DIR / font_code
     font_dist_dir.mkdir(exist_ok=True)
 
-    # Clean up old font files
+    # Clean up old font files, reading the directory only once
     print_info(f"Cleaning old font files in {font_dist_dir}...", Symbols.CLEANING)
-    for old_font in font_dist_dir.glob("*.ttf"):
-        print_colored(f"  Removing old font file: {old_font.name}", Colors.DIM, Symbols.BULLET)
-        old_font.unlink(missing_ok=True)
-    for old_font in font_dist_dir.glob("*.woff"):
-        print_colored(f"  Removing old font file: {old_font.name}", Colors.DIM, Symbols.BULLET)
-        old_font.unlink(missing_ok=True)
-    for old_font in font_dist_dir.glob("*.woff2"):
-        print_colored(f"  Removing old font file: {old_font.name}", Colors.DIM, Symbols.BULLET)
-        old_font.unlink(missing_ok=True)
-    for old_font in font_dist_dir.glob("*.css"):
-        print_colored(f"  Removing old CSS file: {old_font.name}", Colors.DIM, Symbols.BULLET)
-        old_font.unlink(missing_ok=True)
+    with os.scandir(font_dist_dir) as entries:
+        for entry in entries:
+            kind = OLD_OUTPUT_KINDS.get(os.path.splitext(entry.name)[1])
+            if kind is not None:
+                print_colored(f"  Removing old {kind} file: {entry.name}", Colors.DIM, Symbols.BULLET)
+                os.unlink(entry.path)
 
     # Clean up old CSS files
     print_info(f"Cleaning old CSS files in {DEMO_DIR}...", Symbols.CLEANING)
-    for old_css in DEMO_DIR.glob(f"{font_code}-*.css"):
-        print_colored(f"  Removing old CSS file: {old_css.name}", Colors.DIM, Symbols.BULLET)
-        old_css.unlink(missing_ok=True)
+    with os.scandir(DEMO_DIR) as entries:
+        for entry in entries:
+            if entry.name.startswith(f"{font_code}-") and entry.name.endswith(".css"):
+                print_colored(f"  Removing old CSS file: {entry.name}", Colors.DIM, Symbols.BULLET)
+                os.unlink(entry.path)
 
     # Prepare nanoemoji parameters
     nanoemoji_params = prepare_nanoemoji_params(
         f"{font_name}-{version}",
         icon_dir_path,
         font_dist_dir,
-        symbols
+        symbols,
+        font_code
     )
 
     # Generate TTF - inline replacement for build_font_with_nanoemoji call
     # Step 1: Generate basic font
-    font_file, glyph_mappings = build_nanoemoji_font(nanoemoji_params)
+    font_file, glyph_mappings = build_nanoemoji_font(nanoemoji_params, force)
 
     success = False
 
     if font_file is not None and glyph_mappings is not None:
         # Step 2: Add ligature functionality
-        success = add_ligatures_to_font(font_file, nanoemoji_params["output_file"], glyph_mappings)
+        success = add_ligatures_to_font(
+            font_file,
+            nanoemoji_params["output_file"],
+            glyph_mappings,
+            nanoemoji_params["temp_dir"]
+        )
 
     # TTF path
     ttf_path = font_dist_dir / f"{font_name}-{version}.ttf"
@@ -1101,14 +1336,18 @@ def process_icon_set(icon_dir):
         examples = config.get("example", [])
         html_path = generate_html(font_name, font_code, symbols, css_path, categories, styles, examples)
 
-        print_success(f"Generated font files for {font_name}:", Symbols.GENERATED)
-        for fmt, path in font_files.items():
-            if path:
-                print_colored(f"  - {fmt.upper()}: {Path(path).name}", Colors.BRIGHT_GREEN, Symbols.CHECK)
-        print_colored(f"  - CSS: {css_path.name}", Colors.BRIGHT_GREEN, Symbols.CHECK)
-        print_colored(f"  - HTML demo: {html_path.name}", Colors.BRIGHT_GREEN, Symbols.CHECK)
+        # 汇总报告一次性写出，避免多进程输出交错
+        report = [format_colored(f"Generated font files for {font_name}:", Colors.BRIGHT_GREEN, Symbols.GENERATED, bold=True)]
+        report.extend(
+            format_colored(f"  - {fmt.upper()}: {Path(path).name}", Colors.BRIGHT_GREEN, Symbols.CHECK)
+            for fmt, path in font_files.items() if path
+        )
+        report.append(format_colored(f"  - CSS: {css_path.name}", Colors.BRIGHT_GREEN, Symbols.CHECK))
+        report.append(format_colored(f"  - HTML demo: {html_path.name}", Colors.BRIGHT_GREEN, Symbols.CHECK))
+        sys.stdout.write("\n".join(report) + "\n")
+        sys.stdout.flush()
 
-        return {
+        result = {
             "name": font_name,
             "code": font_code,
             "version": version,
@@ -1118,6 +1357,10 @@ def process_icon_set(icon_dir):
             "symbols": symbols,
             "categories": categories
         }
+
+        save_cached_result(icon_dir_path, digest, result)
+
+        return result
     else:
         print_error(f"Failed to generate TTF font for {font_name}")
         return None
@@ -1133,6 +1376,7 @@ Examples:
   python build.py --icons magic      # Build only magic icon set
   python build.py --icons magic lorcana  # Build magic and lorcana icon sets
   python build.py -i magic           # Short form for --icons
+  python build.py --force            # Rebuild even if nothing changed
         """
     )
 
@@ -1149,6 +1393,12 @@ Examples:
         help='List all available icon sets and exit'
     )
 
+    parser.add_argument(
+        '--force', '-f',
+        action='store_true',
+        help='Rebuild all icon sets even if their inputs have not changed'
+    )
+
     parser.add_argument(
         '--verbose', '-v',
         action='store_true',
@@ -1157,17 +1407,28 @@ Examples:
 
     return parser.parse_args()
 
+def find_icon_dirs() -> List[Path]:
+    """Find icon set directories containing a config.toml"""
+    # scandir的is_dir使用目录项中的类型信息，无需额外stat
+    with os.scandir(ICONS_DIR) as entries:
+        return [
+            Path(entry.path) for entry in entries
+            if entry.is_dir() and os.path.isfile(os.path.join(entry.path, "config.toml"))
+        ]
+
 def list_available_icon_sets():
     """List all available icon sets"""
     print_info("Available icon sets:", Symbols.INFO)
 
-    icon_dirs = [d for d in ICONS_DIR.iterdir() if d.is_dir() and (d / "config.toml").exists()]
+    icon_dirs = find_icon_dirs()
 
     if not icon_dirs:
         print_warning("No icon sets found with config.toml files", Symbols.WARNING)
         return []
 
     icon_sets = []
+    # 列表行先收集起来，最后一次性写出
+    lines = []
     for icon_dir in icon_dirs:
         try:
             config = read_config(icon_dir / "config.toml")
@@ -1176,10 +1437,13 @@ def list_available_icon_sets():
             version = config.get("version", "unknown")
             symbol_count = len(config.get("symbols", []))
 
-            print_colored(f"  • {code} - {name} (v{version}) - {symbol_count} symbols", Colors.BRIGHT_CYAN, Symbols.BULLET)
+            lines.append(format_colored(f"  • {code} - {name} (v{version}) - {symbol_count} symbols", Colors.BRIGHT_CYAN, Symbols.BULLET))
             icon_sets.append(code)
         except Exception as e:
-            print_warning(f"Error reading config for {icon_dir.name}: {e}", Symbols.WARNING)
+            lines.append(format_colored(f"Error reading config for {icon_dir.name}: {e}", Colors.BRIGHT_YELLOW, Symbols.WARNING, bold=True))
+
+    sys.stdout.write("".join(f"{line}\n" for line in lines))
+    sys.stdout.flush()
 
     return icon_sets
 
@@ -1192,6 +1456,14 @@ def main():
         list_available_icon_sets()
         return
 
+    # 在启动工作进程前检查压缩等级，避免在brotli内部失败后被误报为缺少模块
+    if not 0 <= BROTLI_QUALITY <= 11:
+        print_error(
+            f"Invalid CHROMANA_BROTLI_QUALITY: {BROTLI_QUALITY_SETTING!r} (expected an integer from 0 to 11)",
+            Symbols.ERROR
+        )
+        sys.exit(1)
+
     # Check dependencies
     print_step("Starting Chromana font build", Symbols.BUILDING)
     if args.verbose:
@@ -1200,12 +1472,15 @@ def main():
     check_dependencies()
 
     # Find icon directories
-    all_icon_dirs = [d for d in ICONS_DIR.iterdir() if d.is_dir() and (d / "config.toml").exists()]
+    all_icon_dirs = find_icon_dirs()
 
     if not all_icon_dirs:
         print_error("No icon sets found with config.toml files", Symbols.ERROR)
         return
 
+    # Configs already parsed while filtering, passed on so workers don't parse them again
+    configs: Dict[Path, Config] = {}
+
     # Filter icon directories based on command line arguments
     if args.icons is not None:
         if len(args.icons) == 0:
@@ -1223,6 +1498,7 @@ def main():
                 code = config.get("code", icon_dir.name)
                 if code in specified_icons:
                     icon_dirs.append(icon_dir)
+                    configs[icon_dir] = config
                     specified_icons.remove(code)
             except Exception as e:
                 print_warning(f"Error reading config for {icon_dir.name}: {e}", Symbols.WARNING)
@@ -1241,16 +1517,36 @@ def main():
         icon_dirs = all_icon_dirs
         print_info(f"Found {len(icon_dirs)} icon sets", Symbols.FOUND)
 
-    # Process each icon set
+    # Process icon sets in parallel, each in its own worker process
     successful_builds = 0
-    for icon_dir in icon_dirs:
-        result = process_icon_set(icon_dir)
-        if result:
-            successful_builds += 1
+    cleanup_threads: List[threading.Thread] = []
+    max_workers = min(len(icon_dirs), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(process_icon_set, str(d), args.force, configs.get(d)): d for d in icon_dirs}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                print_error(f"Error building {futures[future].name}: {e}", Symbols.ERROR)
+                continue
+
+            if result:
+                successful_builds += 1
+
+                # 已完成的图标集在后台清理其临时目录，与其余构建并行
+                cleanup_thread = threading.Thread(
+                    target=shutil.rmtree,
+                    args=(TEMP_DIR / result["code"],),
+                    kwargs={"ignore_errors": True}
+                )
+                cleanup_thread.start()
+                cleanup_threads.append(cleanup_thread)
 
     # Clean up temporary files
     print_step("Cleaning up temporary files...", Symbols.CLEANING)
     try:
+        for cleanup_thread in cleanup_threads:
+            cleanup_thread.join()
         shutil.rmtree(TEMP_DIR, ignore_errors=True)
         print_success("Temporary files cleaned", Symbols.CHECK)
     except Exception as e:
@@ -2,7 +2,6 @@
 # -*- coding: utf-8 -*-
 
 import os
-import shutil
 from pathlib import Path
 
 # 项目根目录
@@ -15,9 +14,17 @@ def clean_directory(dir_path):
     """清理目录，如果目录存在则删除其中的所有内容"""
     if dir_path.exists():
         print(f"清理目录: {dir_path}")
-        shutil.rmtree(dir_path)
-        # 重新创建空目录
-        dir_path.mkdir(exist_ok=True)
+        # 自底向上删除目录内容，保留目录本身，无需删除后重新创建
+        for root, dirs, files in os.walk(dir_path, topdown=False):
+            for name in files:
+                os.unlink(os.path.join(root, name))
+            for name in dirs:
+                path = os.path.join(root, name)
+                # os.walk不进入目录的符号链接，直接删除链接本身
+                if os.path.islink(path):
+                    os.unlink(path)
+                else:
+                    os.rmdir(path)
     else:
         print(f"目录不存在，跳过: {dir_path}")
 
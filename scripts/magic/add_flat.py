@@ -3,12 +3,15 @@
 
 import os
 import sys
-import svgutils.transform as sg
+import copy
+import functools
+from lxml import etree
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 
 # 添加父目录到系统路径，以便导入父目录中的模块
 sys.path.append(str(Path(__file__).parent.parent))
-from read_config import read_config
+from read_config import read_config, Symbol
 
 BASE_PATH = 'icons/magic'
 CONFIG_PATH = 'icons/magic/config.toml'
@@ -37,25 +40,57 @@ fill_map = {
     '#CCC2C0': '#000000',
 }
 
-def create_flat_simple(svg_path: str, output_path: str):
-    fig = sg.SVGFigure(100, 100)
+SVG_NAMESPACE = "http://www.w3.org/2000/svg"
+SVG = f"{{{SVG_NAMESPACE}}}"
+NSMAP = {None: SVG_NAMESPACE, "xlink": "http://www.w3.org/1999/xlink"}
+CIRCLE_TAG = SVG + "circle"
+
+def new_figure():
+    """创建100x100的空白SVG根元素"""
+    root = etree.Element(SVG + "svg", nsmap=NSMAP)
+    root.set("version", "1.1")
+    root.set("viewBox", "0 0 100 100")
+    return root
+
+def parse_svg(svg_path: str):
+    return etree.parse(svg_path, parser=etree.XMLParser(huge_tree=True)).getroot()
+
+@functools.lru_cache(maxsize=None)
+def load_template(svg_path: str):
+    """模板和部件文件在每个进程中只解析一次，使用时需先复制"""
+    return parse_svg(svg_path)
+
+def load_group(root):
+    """将SVG根元素的子元素移入一个<g>分组"""
+    attrib = {"class": root.attrib["class"]} if "class" in root.attrib else None
+    group = etree.Element(SVG + "g", attrib=attrib)
+    group.extend(root.getchildren())
+
+    return group
+
+def save_figure(root, output_path: str):
+    # 先写入临时文件再替换，避免其他进程读到写了一半的文件
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(etree.tostring(root, xml_declaration=True, standalone=True, pretty_print=True))
+    os.replace(tmp_path, output_path)
 
-    fig1 = sg.fromfile(svg_path)
-    fig2 = sg.fromfile(FLAT_PATH)
+def create_flat_simple(svg_path: str, output_path: str):
+    fig = new_figure()
 
-    plot1 = fig1.getroot()
-    plot2 = fig2.getroot()
+    plot1 = load_group(parse_svg(svg_path))
+    plot2 = load_group(copy.deepcopy(load_template(FLAT_PATH)))
 
     g = plot1[0]
 
-    children = g.root.getchildren()
+    children = g.getchildren()
 
-    g.root.clear()
+    g.clear()
 
     basic_fill = ''
 
     for child in children:
-        if child.tag == '{http://www.w3.org/2000/svg}circle':
+        if child.tag == CIRCLE_TAG:
             basic_fill = child.get('fill')
             continue
 
@@ -66,68 +101,65 @@ def create_flat_simple(svg_path: str, output_path: str):
 
         child.set('transform', 'translate(50, 50) scale(0.9) translate(-50, -50)')
 
-        if 'fill' in child.keys():
-            if fill_map.get(basic_fill) is None:
+        if 'fill' in child.attrib:
+            flat_fill = fill_map.get(basic_fill)
+            if flat_fill is None:
                 raise ValueError(f"Unknown fill color: {basic_fill} in {svg_path}")
-            child.set('fill', fill_map[basic_fill])
+            child.set('fill', flat_fill)
 
-        g.root.append(child)
+        g.append(child)
 
     circle = plot2[0]
 
-    circle.root.set('fill', fill_map[basic_fill])
-
-    fig.append([plot2, plot1])
+    circle.set('fill', fill_map[basic_fill])
 
-    fig.root.set("viewBox", "0 0 100 100")
+    group = etree.SubElement(fig, SVG + "g")
+    group.extend([plot2, plot1])
 
-    fig.save(output_path)
+    save_figure(fig, output_path)
 
     print(f"Created shadow  for {svg_path} at {output_path}")
 
 def create_flat_complex(svg_path: str, output_path: str, parts: list[str]):
-    fig = sg.SVGFigure(100, 100)
+    fig = new_figure()
 
-    content = []
+    content = etree.SubElement(fig, SVG + "g")
 
     for part in parts:
-        part_fig = sg.fromfile(f'{PART_PATH}/_{part}.svg')
-
-        part_root = part_fig.getroot()
+        part_root = load_group(copy.deepcopy(load_template(f'{PART_PATH}/_{part}.svg')))
 
         if part.endswith('_up'):
-            part_root.root.set('transform', 'translate(32.32, 32.32) scale(0.9) translate(-32.32, -32.32)')
+            part_root.set('transform', 'translate(32.32, 32.32) scale(0.9) translate(-32.32, -32.32)')
         elif part.endswith('_down'):
-            part_root.root.set('transform', 'translate(67.68, 67.68) scale(0.9) translate(-67.68, -67.68)')
+            part_root.set('transform', 'translate(67.68, 67.68) scale(0.9) translate(-67.68, -67.68)')
 
         content.append(part_root)
 
-    fig.append(content)
+    save_figure(fig, output_path)
 
-    fig.root.set("viewBox", "0 0 100 100")
+    print(f"Created shadow* for {svg_path} at {output_path}")
 
-    fig.save(output_path)
+def add_symbol_flat(symbol: Symbol):
+    file = symbol['file']
 
-    print(f"Created shadow* for {svg_path} at {output_path}")
+    input_path = os.path.join(BASE_PATH, "default", file)
+    output_path = os.path.join(FLAT_OUTPUT_PATH, file)
+
+    if symbol['add_flat'] == True:
+        create_flat_simple(input_path, output_path)
+    elif isinstance(symbol['add_flat'], list):
+        create_flat_complex(input_path, output_path, symbol['add_flat'])
+    else:
+        raise ValueError(f"Invalid add_flat value: {symbol['add_flat']} in {file}")
 
 def main():
     config = read_config(Path(CONFIG_PATH))
 
-    symbols = config['symbols']
-
-    for symbol in symbols:
-        if symbol['add_flat']:
-            file = symbol['file']
-
-            input_path = os.path.join(BASE_PATH, "default", file)
-            output_path = os.path.join(FLAT_OUTPUT_PATH, file)
+    symbols = [symbol for symbol in config['symbols'] if symbol['add_flat']]
 
-            if symbol['add_flat'] == True:
-                create_flat_simple(input_path, output_path)
-            elif isinstance(symbol['add_flat'], list):
-                create_flat_complex(input_path, output_path, symbol['add_flat'])
-            else:
-                raise ValueError(f"Invalid add_flat value: {symbol['add_flat']} in {file}")
+    # 各符号互不依赖，在多个进程中并行生成
+    with ProcessPoolExecutor() as executor:
+        list(executor.map(add_symbol_flat, symbols))
 
 
 if __name__ == "__main__":
@@ -3,12 +3,15 @@
 
 import os
 import sys
+import copy
+import functools
 import svgutils.transform as sg
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 
 # 添加父目录到系统路径，以便导入父目录中的模块
 sys.path.append(str(Path(__file__).parent.parent))
-from read_config import read_config
+from read_config import read_config, Symbol
 
 BASE_PATH = 'icons/magic'
 CONFIG_PATH = 'icons/magic/config.toml'
@@ -17,11 +20,17 @@ SHADOW_OUTPUT_PATH = 'icons/magic/shadow'
 
 os.makedirs(SHADOW_OUTPUT_PATH, exist_ok=True)
 
+@functools.lru_cache(maxsize=None)
+def load_shadow_template():
+    """阴影模板在每个进程中只解析一次，使用时需先复制"""
+    return sg.fromfile(SHADOW_PATH).root
+
 def create_shadow(svg_path, output_path):
     fig = sg.SVGFigure(100, 100)
 
     fig1 = sg.fromfile(svg_path)
-    fig2 = sg.fromfile(SHADOW_PATH)
+    fig2 = sg.SVGFigure()
+    fig2.root = copy.deepcopy(load_shadow_template())
 
     plot1 = fig1.getroot()
     plot2 = fig2.getroot()
@@ -33,23 +42,29 @@ def create_shadow(svg_path, output_path):
 
     fig.root.set("viewBox", "0 0 108 100")
 
-    fig.save(output_path)
+    # 先写入临时文件再替换，避免其他进程读到写了一半的文件
+    tmp_path = f"{output_path}.tmp"
+    fig.save(tmp_path)
+    os.replace(tmp_path, output_path)
 
     print(f"Created shadow for {svg_path} at {output_path}")
 
-def main():
-    config = read_config(Path(CONFIG_PATH))
+def add_symbol_shadow(symbol: Symbol):
+    file = symbol['file']
 
-    symbols = config['symbols']
+    input_path = os.path.join(BASE_PATH, "default", file)
+    output_path = os.path.join(SHADOW_OUTPUT_PATH, file)
 
-    for symbol in symbols:
-        if symbol['add_shadow']:
-            file = symbol['file']
+    create_shadow(input_path, output_path)
+
+def main():
+    config = read_config(Path(CONFIG_PATH))
 
-            input_path = os.path.join(BASE_PATH, "default", file)
-            output_path = os.path.join(SHADOW_OUTPUT_PATH, file)
+    symbols = [symbol for symbol in config['symbols'] if symbol['add_shadow']]
 
-            create_shadow(input_path, output_path)
+    # 各符号互不依赖，在多个进程中并行生成
+    with ProcessPoolExecutor() as executor:
+        list(executor.map(add_symbol_shadow, symbols))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import sys
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+# 添加父目录到系统路径，以便导入父目录中的模块
+sys.path.append(str(Path(__file__).parent.parent))
+from read_config import read_config, Symbol
+
+from create_loyalty import create_symbol_loyalty
+from add_shadow import add_symbol_shadow
+from add_flat import add_symbol_flat
+
+CONFIG_PATH = 'icons/magic/config.toml'
+
+def build_symbol_assets(symbol: Symbol):
+    """按依赖顺序生成单个符号的全部派生SVG：忠诚度图标可能再被加上阴影或扁平样式"""
+    if symbol['create_loyalty']:
+        create_symbol_loyalty(symbol)
+
+    if symbol['add_shadow']:
+        add_symbol_shadow(symbol)
+
+    if symbol['add_flat']:
+        add_symbol_flat(symbol)
+
+def main():
+    """一次读取配置，遍历一次符号列表，生成 create_loyalty.py、add_shadow.py 和 add_flat.py 的全部输出"""
+    config = read_config(Path(CONFIG_PATH))
+
+    symbols = [
+        symbol for symbol in config['symbols']
+        if symbol['create_loyalty'] or symbol['add_shadow'] or symbol['add_flat']
+    ]
+
+    # 各符号互不依赖，在多个进程中并行生成；模板在每个进程中只解析一次
+    with ProcessPoolExecutor() as executor:
+        list(executor.map(build_symbol_assets, symbols))
+
+
+if __name__ == "__main__":
+    main()
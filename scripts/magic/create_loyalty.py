@@ -4,20 +4,21 @@
 import sys
 import os
 from pathlib import Path
-import xml.etree.ElementTree as ET
+from lxml import etree
 import re
 import math
+import functools
+from concurrent.futures import ProcessPoolExecutor
 from fontTools.ttLib import TTFont
 from fontTools.pens.svgPathPen import SVGPathPen
 from fontTools.pens.transformPen import TransformPen
 
 # 添加父目录到系统路径，以便导入父目录中的模块
 sys.path.append(str(Path(__file__).parent.parent))
-from read_config import read_config
+from read_config import read_config, Symbol
 
-# 设置命名空间
-ET.register_namespace('', "http://www.w3.org/2000/svg")
-SVG_NS = {"svg": "http://www.w3.org/2000/svg"}
+# SVG命名空间
+SVG = "{http://www.w3.org/2000/svg}"
 
 # 项目根目录（使用pwd作为当前工作目录）
 PROJECT_ROOT = Path(os.getcwd())
@@ -34,6 +35,46 @@ LOYALTY_DOWN_PATH = f'{ICONS_DIR}/_loyalty_down.svg'
 
 NAUGHT_CENTER_Y = 60
 
+# 文本高度与字号之比，查询上升部和下降部计算得知
+# （不等于hhea的上升部与下降部之差，改用后者会移动已生成图标中文本的位置）
+TEXT_HEIGHT_RATIO = 0.784
+
+# 去掉连字两端的方括号
+LIGATURE_BRACKETS = re.compile(r'^\[|\]$')
+
+@functools.lru_cache(maxsize=4)
+def load_font(font_path):
+    """
+    加载字体并缓存，同一进程内的多次调用共享解析结果
+
+    返回:
+        glyph_set: 字形集合
+        cmap: Unicode到字形名称的映射
+        units_per_em: 字体的unitsPerEm值
+        metrics: 字形名称到(前进宽度, 左侧支撑)的映射（hmtx表，只读取一次）
+    """
+    font = TTFont(font_path)
+
+    # 从字体获取unitsPerEm值
+    head_table = font.get('head')
+    units_per_em = 1000  # 默认值
+    if head_table:
+        units_per_em = getattr(head_table, 'unitsPerEm', 1000)
+
+    return font.getGlyphSet(), font.getBestCmap(), units_per_em, font['hmtx'].metrics
+
+class TextPathPen(SVGPathPen):
+    """
+    所有字符共用的路径笔
+
+    SVGPathPen拼接命令时不加分隔符，这里在字符之间显式插入空格，
+    生成的路径文本与逐字符取出命令再用空格连接时相同。
+    separate直接向SVGPathPen内部的_commands列表追加，依赖fontTools的实现细节
+    """
+
+    def separate(self):
+        self._commands.append(" ")
+
 def text_to_path(text, font_path, font_size):
     """
     将文本转换为SVG路径
@@ -50,61 +91,44 @@ def text_to_path(text, font_path, font_size):
         height: 文本高度
     """
     try:
-        font = TTFont(font_path)
-
-        # 从字体获取unitsPerEm值
-        head_table = font.get('head')
-        units_per_em = 1000  # 默认值
-        if head_table:
-            units_per_em = getattr(head_table, 'unitsPerEm', 1000)
+        glyph_set, cmap, units_per_em, metrics = load_font(font_path)
 
         scale = font_size / units_per_em
 
-        # 创建SVG路径收集器
-        glyph_set = font.getGlyphSet()
-        svg_path_pen = SVGPathPen(glyph_set)
-
-        # 获取文本的总宽度
-        total_width = 0
-        path_commands = []
-
-        # 处理每个字符
+        # 查找每个字符的字形名称
+        glyph_names = []
         for char in text:
-            # 获取字符的字形名称
             unicode_value = ord(char)
-            cmap = font.getBestCmap()
             glyph_name = cmap.get(unicode_value)
 
             if not glyph_name:
                 print(f"警告: 字符 '{char}' (Unicode {hex(unicode_value)}) 在字体中找不到对应的字形")
                 continue
 
-            # 获取字形
-            glyph = glyph_set[glyph_name]
+            glyph_names.append(glyph_name)
 
-            # 应用变换和偏移
-            transform = (scale, 0, 0, -scale, total_width * scale, 0)
-            transform_pen = TransformPen(svg_path_pen, transform)
+        # 所有字符绘制到同一个路径笔中，最后一次性取出路径命令
+        svg_path_pen = TextPathPen(glyph_set)
 
-            # 绘制字形路径
-            glyph.draw(transform_pen)
+        # 获取文本的总宽度
+        total_width = 0
 
-            # 获取当前字符的SVG命令并存储
-            current_commands = svg_path_pen.getCommands()
-            path_commands.append(current_commands)
+        for i, glyph_name in enumerate(glyph_names):
+            if i > 0:
+                svg_path_pen.separate()
 
-            # 重置路径笔以准备下一个字符
-            svg_path_pen = SVGPathPen(glyph_set)
+            # 应用变换和偏移
+            transform = (scale, 0, 0, -scale, total_width * scale, 0)
+            glyph_set[glyph_name].draw(TransformPen(svg_path_pen, transform))
 
             # 累加宽度
-            total_width += glyph.width
+            total_width += metrics[glyph_name][0]
 
-        # 合并所有路径命令
-        all_path_data = " ".join(path_commands)
+        all_path_data = svg_path_pen.getCommands()
 
         # 获取文本总体宽度和高度的估计值
         text_width = total_width * scale
-        text_height = font_size * 0.784  # 查询上升部和下降部计算得知
+        text_height = font_size * TEXT_HEIGHT_RATIO
 
         return all_path_data, text_width, text_height
 
@@ -126,69 +150,73 @@ def add_text_to_svg(svg_path, text, output_path):
 
     text = text.replace('-', '−')
 
-    try:
-        # 解析SVG文件
-        tree = ET.parse(svg_path)
-        root = tree.getroot()
+    # 解析SVG文件
+    tree = etree.parse(svg_path)
+    root = tree.getroot()
 
-        # 获取SVG尺寸
-        viewbox: str = root.get("viewBox", '')
-        width = int(viewbox.split()[2])
-        height = int(viewbox.split()[3])
+    # 获取SVG尺寸
+    viewbox: str = root.get("viewBox", '')
+    _, _, width, height = map(int, viewbox.split())
 
-        # 将文本转换为路径
-        font_path = os.path.join(PROJECT_ROOT, FONT_PATH)
-        path_data, text_width, text_height = text_to_path(text, font_path, font_size=60)
+    # 将文本转换为路径
+    font_path = os.path.join(PROJECT_ROOT, FONT_PATH)
+    path_data, text_width, text_height = text_to_path(text, font_path, font_size=60)
 
-        if not path_data:
-            raise ValueError("无法将文本转换为路径")
+    if not path_data:
+        raise ValueError("无法将文本转换为路径")
 
-        # 创建路径元素
-        path_elem = ET.SubElement(root, "path")
-        path_elem.set("d", path_data)
-        path_elem.set("fill", "currentColor")
+    # 创建路径元素
+    path_elem = etree.SubElement(root, SVG + "path")
+    path_elem.set("d", path_data)
+    path_elem.set("fill", "currentColor")
 
-        # 计算居中位置
-        x_offset = (width - text_width) / 2
+    # 计算居中位置
+    x_offset = (width - text_width) / 2
 
-        # 获取text基线到中心的偏移量
-        # 使用字体高度的一半作为基准，再微调以达到视觉居中效果
-        y_offset = height / 2 + text_height * 0.35
+    # 获取text基线到中心的偏移量
+    # 使用字体高度的一半作为基准，再微调以达到视觉居中效果
+    y_offset = height / 2 + text_height * 0.35
 
-        # 应用变换以使文本完全居中
-        path_elem.set("transform", f"translate({x_offset}, {y_offset})")
+    # 应用变换以使文本完全居中
+    path_elem.set("transform", f"translate({x_offset}, {y_offset})")
 
-        # 保存修改后的SVG
-        tree.write(output_path, encoding="utf-8", xml_declaration=True)
-        print(f"SVG文件已成功创建：{output_path}")
+    # 保存修改后的SVG
+    # 先写入临时文件再替换，避免其他进程读到写了一半的文件
+    tmp_path = f"{output_path}.tmp"
+    tree.write(tmp_path, encoding="utf-8", xml_declaration=True)
+    os.replace(tmp_path, output_path)
+    print(f"SVG文件已成功创建：{output_path}")
 
-    except Exception as e:
-        print(f"处理SVG时出错：{e}")
-        sys.exit(1)
+def create_symbol_loyalty(symbol: Symbol):
+    file = symbol['file']
 
-def main():
-    config = read_config(Path(CONFIG_PATH))
+    output_path = os.path.join(LOYALTY_OUTPUT_PATH, file)
 
-    symbols = config['symbols']
+    text = LIGATURE_BRACKETS.sub('', symbol['ligature'][0])
 
-    for symbol in symbols:
-        if symbol['create_loyalty']:
-            file = symbol['file']
+    if text == '0':
+        svg_path = LOYALTY_NAUGHT_PATH
+    elif text.startswith('+'):
+        svg_path = LOYALTY_UP_PATH
+    elif text.startswith('-'):
+        svg_path = LOYALTY_DOWN_PATH
+    else:
+        raise ValueError(f"Invalid loyalty text: {text} in {symbol['name']} ({file})")
 
-            output_path = os.path.join(LOYALTY_OUTPUT_PATH, file)
+    # 在工作进程中出错时抛出带符号名的异常，由主进程的executor.map重新抛出
+    try:
+        add_text_to_svg(svg_path, text, output_path)
+    except Exception as e:
+        raise ValueError(f"Failed to create loyalty symbol {symbol['name']}: {e}") from e
 
-            text = re.sub(r'^\[|\]$', '', symbol['ligature'][0])
+def main():
+    config = read_config(Path(CONFIG_PATH))
 
-            if text == '0':
-                svg_path = LOYALTY_NAUGHT_PATH
-            elif text.startswith('+'):
-                svg_path = LOYALTY_UP_PATH
-            elif text.startswith('-'):
-                svg_path = LOYALTY_DOWN_PATH
-            else:
-                raise ValueError(f"Invalid loyalty text: {text} in {file}")
+    symbols = [symbol for symbol in config['symbols'] if symbol['create_loyalty']]
 
-            add_text_to_svg(svg_path, text, output_path)
+    # 各符号互不依赖，在多个进程中并行生成
+    with ProcessPoolExecutor() as executor:
+        list(executor.map(create_symbol_loyalty, symbols))
 
 if __name__ == "__main__":
     main()
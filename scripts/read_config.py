@@ -1,8 +1,16 @@
 import os
+import sys
+import pickle
+import hashlib
 from pathlib import Path
-import toml
 from typing import TypedDict, List, Optional
 
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    # Python 3.11之前使用API相同的tomli
+    import tomli as tomllib
+
 SHADOW_DIR = "shadow"
 FLAT_DIR = "flat"
 
@@ -38,46 +46,91 @@ class Config(TypedDict):
     styles: Optional[List[Style]]
     symbols: List[Symbol]
 
+# 修改read_config的输出结构时递增，使旧的缓存失效
+CONFIG_CACHE_VERSION = 2
+
+# 解析结果缓存在构建目录中，不写入源码树
+CONFIG_CACHE_DIR = Path(__file__).resolve().parent.parent / "build" / "config_cache"
+
+def config_cache_path(config_path: Path) -> Path:
+    """配置文件对应的缓存位置，以图标集目录名和配置文件的绝对路径区分"""
+    resolved = config_path.resolve()
+    key = hashlib.sha1(str(resolved).encode()).hexdigest()[:12]
+    return CONFIG_CACHE_DIR / f"{resolved.parent.name}.{key}.pkl"
+
 def read_config(config_path: Path) -> Config:
-    with open(config_path, "r") as f:
-        raw = toml.load(f)
+    """读取配置，解析结果以pickle缓存在build/config_cache中，文件未修改时直接加载"""
+    config_path = Path(config_path)
+    cache_path = config_cache_path(config_path)
+
+    st = config_path.stat()
+    stamp = (CONFIG_CACHE_VERSION, st.st_mtime_ns, st.st_size)
+
+    # 缓存损坏或由旧版本写入时，pickle.load可能抛出任何异常，一律当作未命中重新解析
+    try:
+        with open(cache_path, "rb") as f:
+            cached_stamp, config = pickle.load(f)
+        if cached_stamp == stamp:
+            return config
+    except Exception:
+        pass
+
+    config = parse_config(config_path)
+
+    # 先写入临时文件再替换，并行构建时不会读到不完整的缓存
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        CONFIG_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            pickle.dump((stamp, config), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+    return config
+
+def parse_config(config_path: Path) -> Config:
+    with open(config_path, "rb") as f:
+        raw = tomllib.load(f)
 
     example = raw.get("example")
 
-    categories = raw.get("categories")
+    raw_categories = raw.get("categories")
+    categories: Optional[List[Category]] = None
 
-    if categories is not None:
-        categories = [Category(
-            name=cat["name"],
-            display_name=cat.get("display-name", cat["name"])
-        ) for cat in categories]
+    if raw_categories is not None:
+        categories = [{
+            "name": cat["name"],
+            "display_name": cat.get("display-name", cat["name"])
+        } for cat in raw_categories]
 
-    styles = raw.get("styles")
+    raw_styles = raw.get("styles")
+    styles: Optional[List[Style]] = None
 
-    if styles is not None:
-        styles = [Style(
-            name=style["name"],
-            display_name=style.get("display-name", style["name"])
-        ) for style in styles]
+    if raw_styles is not None:
+        styles = [{
+            "name": style["name"],
+            "display_name": style.get("display-name", style["name"])
+        } for style in raw_styles]
 
     symbols: list[Symbol] = []
 
+    # 解析出的符号表只在这里使用，直接原地规范化后作为Symbol返回
     for sym in raw.get("symbols", []):
-        name = sym["name"]
-        file = sym["file"]
-
-        ligature = sym.get("ligature", [])
+        ligature = sym.setdefault("ligature", [])
 
         if isinstance(ligature, str):
-            ligature = [ligature]
-
-        category = sym.get("category", "default")
-        overflow = sym.get("overflow", False)
-        variant = sym.get("variant", {})
-        style = sym.get("style", {})
-        add_shadow = sym.get("add-shadow", False)
-        add_flat = sym.get("add-flat", False)
-        create_loyalty = sym.get("create-loyalty", False)
+            sym["ligature"] = [ligature]
+
+        # 分类、文件名和变体/风格目录名在大量符号间重复，驻留后相等的字符串共用同一对象
+        sym["file"] = sys.intern(sym["file"])
+        sym["category"] = sys.intern(sym.get("category", "default"))
+        sym.setdefault("overflow", False)
+        sym["variant"] = {sys.intern(k): sys.intern(v) for k, v in sym.get("variant", {}).items()}
+        style = sym["style"] = {sys.intern(k): sys.intern(v) for k, v in sym.get("style", {}).items()}
+        add_shadow = sym["add_shadow"] = sym.pop("add-shadow", False)
+        add_flat = sym["add_flat"] = sym.pop("add-flat", False)
+        sym["create_loyalty"] = sym.pop("create-loyalty", False)
 
         if add_shadow:
             style["shadow"] = SHADOW_DIR
@@ -85,18 +138,7 @@ def read_config(config_path: Path) -> Config:
         if add_flat:
             style["flat"] = FLAT_DIR
 
-        symbols.append(Symbol(
-            name=name,
-            file=file,
-            ligature=ligature,
-            category=category,
-            overflow=overflow,
-            variant=variant,
-            style=style,
-            add_shadow=add_shadow,
-            add_flat=add_flat,
-            create_loyalty=create_loyalty
-        ))
+        symbols.append(sym)
 
     return Config(
         name=raw.get("name", ""),
@@ -4,7 +4,10 @@
 import os
 import sys
 import http.server
-import socketserver
+import threading
+import time
+from http import HTTPStatus
+from collections import OrderedDict
 from pathlib import Path
 
 # 项目根目录
@@ -25,46 +28,91 @@ print(f"Server directories:")
 print(f"- dist: {DIST_DIR}")
 print(f"- demo: {DEMO_DIR}")
 
+# 请求路径解析中用到的目录，启动时计算一次
+# （服务器运行期间不会切换工作目录）
+CWD = os.getcwd()
+DEMO_ROOT = str(DEMO_DIR)
+DIST_ROOT = str(DIST_DIR)
+DEMO_INDEX = str(DEMO_DIR / "index.html")
+
+# 不存在路径的缓存，浏览器反复请求缺失的favicon等文件时跳过stat
+# 条目只保留很短时间，构建生成的新文件很快就能访问
+MISSING_CACHE_SIZE = 1024
+MISSING_TTL = 2.0  # 秒
+MISSING_PATHS: "OrderedDict[str, float]" = OrderedDict()
+MISSING_LOCK = threading.Lock()
+
+# 日志中状态码的颜色：2xx为成功（绿色），3xx为重定向（蓝色），4xx、5xx为错误（红色）
+STATUS_COLORS = {'2': "\033[92m", '3': "\033[94m", '4': "\033[91m", '5': "\033[91m"}
+RESET_COLOR = "\033[0m"
+
 # 自定义请求处理器，用于提供来自不同目录的文件
 class ChromanaRequestHandler(http.server.SimpleHTTPRequestHandler):
+    # 响应都带有Content-Length，可以使用持久连接
+    protocol_version = "HTTP/1.1"
+
     def translate_path(self, path):
         # 默认路径处理
         path = super().translate_path(path)
 
+        # 相对路径每个请求只计算一次
+        rel_path = os.path.relpath(path, CWD)
+
         # 处理根路径 - 显示索引页面
-        rel_path = os.path.relpath(path, os.getcwd())
         if rel_path == '.' or rel_path == './':
             # 提供演示根目录的索引
-            return str(DEMO_DIR / "index.html")
+            return DEMO_INDEX
+
+        # 最近确认不存在的路径直接返回，避免重复stat
+        with MISSING_LOCK:
+            missed_at = MISSING_PATHS.get(rel_path)
+        if missed_at is not None and time.monotonic() - missed_at < MISSING_TTL:
+            return path
 
         # 检查demo目录
-        demo_path = DEMO_DIR / os.path.relpath(path, os.getcwd())
-        if demo_path.exists():
-            return str(demo_path)
+        demo_path = os.path.join(DEMO_ROOT, rel_path)
+        if os.path.exists(demo_path):
+            return demo_path
 
         # 检查dist目录
-        dist_path = DIST_DIR / os.path.relpath(path, os.getcwd())
-        if dist_path.exists():
-            return str(dist_path)
+        dist_path = os.path.join(DIST_ROOT, rel_path)
+        if os.path.exists(dist_path):
+            return dist_path
+
+        with MISSING_LOCK:
+            MISSING_PATHS[rel_path] = time.monotonic()
+            MISSING_PATHS.move_to_end(rel_path)
+            if len(MISSING_PATHS) > MISSING_CACHE_SIZE:
+                MISSING_PATHS.popitem(last=False)
 
         return path
 
-    def log_message(self, format, *args):
-        # 彩色日志输出
-        if args[1].startswith('2'): # 2xx状态码为成功
-            status = f"\033[92m{args[1]}\033[0m" # 绿色
-        elif args[1].startswith('3'): # 3xx状态码为重定向
-            status = f"\033[94m{args[1]}\033[0m" # 蓝色
-        elif args[1].startswith('4') or args[1].startswith('5'): # 4xx, 5xx为错误
-            status = f"\033[91m{args[1]}\033[0m" # 红色
+    def copyfile(self, source, outputfile):
+        # 文件内容由内核直接发送到套接字（sendfile），不经过Python缓冲区
+        if outputfile is self.wfile:
+            self.connection.sendfile(source)
         else:
-            status = args[1]
+            super().copyfile(source, outputfile)
+
+    def log_request(self, code='-', size='-'):
+        # 彩色日志输出，颜色前缀预先计算，直接拼接请求行而不经过%格式化
+        if isinstance(code, HTTPStatus):
+            code = code.value
+        code = str(code)
 
-        print(f"{self.address_string()} - {status} {args[0] % args[1:]}")
+        color = STATUS_COLORS.get(code[:1])
+        status = f"{color}{code}{RESET_COLOR}" if color else code
+
+        sys.stdout.write(f'{self.address_string()} - {status} "{self.requestline}" {size}\n')
+
+    def log_message(self, format, *args):
+        # 其他日志（如错误信息）不着色
+        sys.stdout.write(f"{self.address_string()} - {format % args}\n")
 
-# 启动服务器
+# 启动服务器，每个请求在单独的线程中处理，浏览器可以并行加载资源
 handler = ChromanaRequestHandler
-with socketserver.TCPServer(("", PORT), handler) as httpd:
+with http.server.ThreadingHTTPServer(("", PORT), handler) as httpd:
+    httpd.daemon_threads = True
     print(f"\nServer running at http://localhost:{PORT}/")
     print("Press Ctrl+C to stop")
     try: